@@ -1,6 +1,7 @@
 from typing import Any
 from curl_cffi import requests
 from pyzill.parse import parse_body_home, parse_body_deparments
+from pyzill.limiter import get_limiter
 
 # Заголовки HTTP-запросов для имитации браузера Chrome
 headers = {
@@ -108,8 +109,11 @@ def get_from_home_url(home_url: str, proxy_url: str | None = None) -> dict[str,
     """
     # Настройка прокси-сервера, если указан
     proxies = {"http": proxy_url, "https": proxy_url} if proxy_url else None
-    # Выполнение GET-запроса к указанному URL с заголовками и имитацией браузера
-    response = requests.get(url=home_url, headers=headers, proxies=proxies, impersonate="chrome124")
+    # Выполнение GET-запроса к указанному URL в пределах адаптивного лимита одновременных запросов
+    with get_limiter("homedetails").request() as slot:
+        response = requests.get(url=home_url, headers=headers, proxies=proxies, impersonate="chrome124")
+        # Передача кода ответа ограничителю (403/429 снижают лимит)
+        slot.record(response.status_code)
     # Вызов исключения в случае ошибки HTTP
     response.raise_for_status()
     # Парсинг содержимого ответа для получения информации о доме
@@ -0,0 +1,395 @@
+from collections import deque
+from contextlib import contextmanager
+from threading import Condition, Lock
+from time import perf_counter, time
+from typing import Any, Iterator
+
+# Коды ответа, которые Zillow возвращает при троттлинге и блокировке
+THROTTLE_STATUSES = frozenset({403, 429})
+
+
+class AdaptiveLimiter:
+    """
+    Адаптивный ограничитель количества одновременных запросов (AIMD)
+
+    Лимит растет аддитивно (на additive_increase за каждые limit успешных ответов),
+    пока задержка и доля ошибок остаются в норме, и уменьшается мультипликативно
+    при сигналах троттлинга (403/429) или при превышении порога ошибок.
+
+    Успешным считается ответ 2xx/3xx. Ошибкой считаются 403/429, 5xx и исключения;
+    только ошибка может снизить лимит. Остальные ответы 4xx (например, 404 для
+    снятого объявления) не говорят о нагрузке на сервер: они не учитываются в доле
+    ошибок и не увеличивают лимит. Высокая задержка лимит не снижает, а только
+    останавливает его рост.
+
+    Аргументы:
+        endpoint (str): имя конечной точки, для которой ведется лимит
+        initial_limit (int): начальное количество одновременных запросов
+        min_limit (int): минимально допустимый лимит
+        max_limit (int): максимально допустимый лимит
+        additive_increase (float): прирост лимита за одно "окно" успешных запросов
+        backoff_factor (float): множитель лимита при троттлинге
+        latency_target (float): допустимая сглаженная задержка ответа в секундах
+        error_threshold (float): допустимая сглаженная доля ошибок (от 0 до 1)
+        smoothing (float): коэффициент экспоненциального сглаживания задержки и ошибок
+        history_size (int): количество хранимых изменений лимита
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        additive_increase: float = 1.0,
+        backoff_factor: float = 0.5,
+        latency_target: float = 5.0,
+        error_threshold: float = 0.15,
+        smoothing: float = 0.1,
+        history_size: int = 1000,
+    ):
+        # При значениях по умолчанию одна ошибка дает долю 0.1 (ниже порога),
+        # а две подряд - 0.19, что уже считается превышением порога
+        _validate(
+            initial_limit=initial_limit,
+            min_limit=min_limit,
+            max_limit=max_limit,
+            additive_increase=additive_increase,
+            backoff_factor=backoff_factor,
+            latency_target=latency_target,
+            error_threshold=error_threshold,
+            smoothing=smoothing,
+            history_size=history_size,
+        )
+        self.endpoint = endpoint
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.additive_increase = additive_increase
+        self.backoff_factor = backoff_factor
+        self.latency_target = latency_target
+        self.error_threshold = error_threshold
+        self.smoothing = smoothing
+        # Дробный лимит: целая часть определяет допустимое число запросов "в полете"
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        # Сглаженные значения задержки и доли ошибок
+        self._latency: float | None = None
+        self._error_rate = 0.0
+        # Момент последнего снижения лимита: ответы на запросы, начатые раньше,
+        # не должны снижать лимит повторно (иначе одна волна 429 обнулит его)
+        self._last_decrease = float("-inf")
+        self._condition = Condition(Lock())
+        self._history: deque[dict[str, Any]] = deque(maxlen=history_size)
+        self._record_change("init")
+
+    def configure(self, **options: Any) -> None:
+        """
+        Изменяет параметры ограничителя на месте
+
+        Запросы, уже выполняющиеся через этот ограничитель, продолжают учитываться
+        в новом лимите. Если передан initial_limit, текущий лимит сбрасывается
+        на него, иначе текущий лимит приводится к новым границам.
+
+        Аргументы:
+            **options: параметры AdaptiveLimiter (кроме endpoint)
+        """
+        unknown = set(options) - set(_OPTIONS)
+        if unknown:
+            raise TypeError(f"неизвестные параметры ограничителя: {', '.join(sorted(unknown))}")
+        with self._condition:
+            # Собираем итоговые значения всех параметров и проверяем их до любых изменений
+            values = {name: options.get(name, getattr(self, name, None)) for name in _OPTIONS}
+            values["history_size"] = options.get("history_size", self._history.maxlen)
+            # Без initial_limit сохраняем текущий лимит, ограничив его новыми границами
+            values["initial_limit"] = options.get(
+                "initial_limit",
+                min(max(self._limit, float(values["min_limit"])), float(values["max_limit"])),
+            )
+            _validate(**values)
+            for name, value in values.items():
+                if name not in ("initial_limit", "history_size"):
+                    setattr(self, name, value)
+            self._limit = float(values["initial_limit"])
+            if "history_size" in options:
+                self._history = deque(self._history, maxlen=values["history_size"])
+            self._record_change("configure")
+            # Будим ожидающие потоки: лимит мог вырасти
+            self._condition.notify_all()
+
+    @property
+    def limit(self) -> int:
+        """
+        Возвращает текущий лимит одновременных запросов
+        """
+        with self._condition:
+            return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """
+        Возвращает количество запросов, выполняющихся в данный момент
+        """
+        with self._condition:
+            return self._in_flight
+
+    @property
+    def history(self) -> list[dict[str, Any]]:
+        """
+        Возвращает историю изменений лимита
+
+        Возвращает:
+            list[dict[str, Any]]: записи с ключами time, limit, reason, latency и error_rate
+        """
+        with self._condition:
+            return list(self._history)
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Возвращает текущее состояние ограничителя
+
+        Возвращает:
+            dict[str, Any]: лимит, число запросов в полете, сглаженные задержка и доля ошибок
+        """
+        with self._condition:
+            return {
+                "endpoint": self.endpoint,
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "latency": self._latency,
+                "error_rate": self._error_rate,
+            }
+
+    @contextmanager
+    def request(self) -> Iterator["_Slot"]:
+        """
+        Занимает слот для одного запроса и освобождает его по завершении
+
+        Блокирует выполнение, пока число запросов в полете не меньше лимита.
+        Код ответа передается через slot.record(status_code); если он не был
+        передан и блок завершился исключением, запрос считается ошибкой, а если
+        блок завершился без исключения - успешным.
+
+        Возвращает:
+            Iterator[_Slot]: слот для передачи кода ответа
+        """
+        with self._condition:
+            # Ожидаем освобождения места под текущий лимит
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+        slot = _Slot()
+        started = perf_counter()
+        try:
+            yield slot
+        except BaseException:
+            # Сетевые ошибки и исключения парсинга считаются неуспешными запросами
+            if slot.status_code is None:
+                slot.failed = True
+            raise
+        finally:
+            self._complete(slot, started, perf_counter() - started)
+
+    def _complete(self, slot: "_Slot", started: float, latency: float) -> None:
+        """
+        Обновляет статистику и лимит по результату запроса
+
+        Аргументы:
+            slot (_Slot): слот с кодом ответа
+            started (float): момент начала запроса (perf_counter)
+            latency (float): задержка запроса в секундах
+        """
+        status_code = slot.status_code
+        throttled = status_code in THROTTLE_STATUSES
+        # Ошибка: исключение, троттлинг или ошибка сервера
+        failed = slot.failed or throttled or (status_code is not None and status_code >= 500)
+        # Успех: ответ 2xx/3xx (или блок без кода ответа, завершившийся без исключения)
+        succeeded = not failed and (status_code is None or status_code < 400)
+        with self._condition:
+            self._in_flight -= 1
+            # Экспоненциальное сглаживание задержки
+            if self._latency is None:
+                self._latency = latency
+            else:
+                self._latency += self.smoothing * (latency - self._latency)
+
+            if failed:
+                self._error_rate += self.smoothing * (1.0 - self._error_rate)
+                # Лимит снижает только ошибка, и не чаще одного раза на "поколение" запросов
+                if (throttled or self._error_rate > self.error_threshold) and started > self._last_decrease:
+                    self._decrease("throttled" if throttled else "errors")
+            elif succeeded:
+                self._error_rate -= self.smoothing * self._error_rate
+                # Высокая задержка или доля ошибок только останавливают рост лимита
+                if self._error_rate <= self.error_threshold and self._latency <= self.latency_target:
+                    self._increase()
+            # Будим ожидающие потоки: лимит или число запросов в полете изменились
+            self._condition.notify_all()
+
+    def _increase(self) -> None:
+        """
+        Аддитивно увеличивает лимит (вызывается под блокировкой)
+        """
+        previous = int(self._limit)
+        self._limit = max(
+            float(self.min_limit),
+            min(float(self.max_limit), self._limit + self.additive_increase / self._limit),
+        )
+        if int(self._limit) != previous:
+            self._record_change("increase")
+
+    def _decrease(self, reason: str) -> None:
+        """
+        Мультипликативно уменьшает лимит (вызывается под блокировкой)
+
+        Аргументы:
+            reason (str): причина снижения лимита для истории
+        """
+        previous = int(self._limit)
+        self._limit = max(float(self.min_limit), self._limit * self.backoff_factor)
+        self._last_decrease = perf_counter()
+        if int(self._limit) != previous:
+            self._record_change(reason)
+
+    def _record_change(self, reason: str) -> None:
+        """
+        Записывает изменение лимита в историю (вызывается под блокировкой)
+
+        Аргументы:
+            reason (str): причина изменения лимита
+        """
+        self._history.append({
+            "time": time(),
+            "limit": int(self._limit),
+            "reason": reason,
+            "latency": self._latency,
+            "error_rate": self._error_rate,
+        })
+
+
+# Параметры, которые можно изменить через AdaptiveLimiter.configure
+_OPTIONS = (
+    "initial_limit",
+    "min_limit",
+    "max_limit",
+    "additive_increase",
+    "backoff_factor",
+    "latency_target",
+    "error_threshold",
+    "smoothing",
+    "history_size",
+)
+
+
+def _validate(
+    initial_limit: float,
+    min_limit: int,
+    max_limit: int,
+    additive_increase: float,
+    backoff_factor: float,
+    latency_target: float,
+    error_threshold: float,
+    smoothing: float,
+    history_size: int,
+) -> None:
+    """
+    Проверяет параметры ограничителя
+
+    Исключения:
+        ValueError: если параметры выходят за допустимые интервалы
+    """
+    if not 1 <= min_limit <= initial_limit <= max_limit:
+        raise ValueError("ожидается 1 <= min_limit <= initial_limit <= max_limit")
+    if not additive_increase > 0:
+        raise ValueError("additive_increase должен быть больше 0")
+    if not 0 < backoff_factor < 1:
+        raise ValueError("backoff_factor должен быть в интервале (0, 1)")
+    if not latency_target >= 0:
+        raise ValueError("latency_target не может быть отрицательным")
+    if not 0 <= error_threshold < 1:
+        raise ValueError("error_threshold должен быть в интервале [0, 1)")
+    if not 0 < smoothing <= 1:
+        raise ValueError("smoothing должен быть в интервале (0, 1]")
+    if not history_size >= 1:
+        raise ValueError("history_size должен быть не меньше 1")
+
+
+class _Slot:
+    """
+    Слот одного запроса, через который передается результат в ограничитель
+    """
+
+    def __init__(self):
+        self.status_code: int | None = None
+        self.failed = False
+
+    def record(self, status_code: int) -> None:
+        """
+        Сохраняет HTTP-код ответа
+
+        Аргументы:
+            status_code (int): HTTP-код ответа
+        """
+        self.status_code = status_code
+
+
+# Ограничители, отдельные для каждой конечной точки
+_limiters: dict[str, AdaptiveLimiter] = {}
+_limiters_lock = Lock()
+
+
+def get_limiter(endpoint: str, **options: Any) -> AdaptiveLimiter:
+    """
+    Возвращает ограничитель для указанной конечной точки, создавая его при первом обращении
+
+    Аргументы:
+        endpoint (str): имя конечной точки ("search", "homedetails")
+        **options: параметры AdaptiveLimiter, применяются только при создании
+
+    Возвращает:
+        AdaptiveLimiter: ограничитель конечной точки
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(endpoint)
+        if limiter is None:
+            limiter = AdaptiveLimiter(endpoint, **options)
+            _limiters[endpoint] = limiter
+        return limiter
+
+
+def configure_limiter(endpoint: str, **options: Any) -> AdaptiveLimiter:
+    """
+    Задает параметры ограничителя конечной точки, создавая его при необходимости
+
+    Существующий ограничитель не заменяется, а перенастраивается на месте, поэтому
+    уже выполняющиеся запросы продолжают учитываться в новом лимите.
+
+    Аргументы:
+        endpoint (str): имя конечной точки ("search", "homedetails")
+        **options: параметры AdaptiveLimiter
+
+    Возвращает:
+        AdaptiveLimiter: ограничитель конечной точки
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(endpoint)
+        if limiter is None:
+            limiter = AdaptiveLimiter(endpoint, **options)
+            _limiters[endpoint] = limiter
+            return limiter
+    limiter.configure(**options)
+    return limiter
+
+
+def limiter_stats() -> dict[str, dict[str, Any]]:
+    """
+    Возвращает состояние всех ограничителей для настройки пропускной способности
+
+    Возвращает:
+        dict[str, dict[str, Any]]: состояние и история лимита по каждой конечной точке
+    """
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {
+        limiter.endpoint: {**limiter.snapshot(), "history": limiter.history}
+        for limiter in limiters
+    }
@@ -1,6 +1,7 @@
 from typing import Any, List
 from curl_cffi import requests
 import json
+from pyzill.limiter import get_limiter
 
 
 def for_sale(
@@ -360,14 +361,17 @@ def search(
     # Настройка прокси-сервера, если указан
     proxies = {"http": proxy_url, "https": proxy_url} if proxy_url else None
     
-    # Выполнение HTTP-запроса к API Zillow
-    response = requests.put(
-        url="https://www.zillow.com/async-create-search-page-state",  # URL-адрес API для создания состояния поиска
-        json=inputData,  # Данные запроса в формате JSON
-        headers=headers,  # Заголовки запроса
-        proxies=proxies,  # Прокси-сервер (если указан)
-        impersonate="chrome124",  # Имитация браузера Chrome версии 124
-    )
+    # Выполнение HTTP-запроса к API Zillow в пределах адаптивного лимита одновременных запросов
+    with get_limiter("search").request() as slot:
+        response = requests.put(
+            url="https://www.zillow.com/async-create-search-page-state",  # URL-адрес API для создания состояния поиска
+            json=inputData,  # Данные запроса в формате JSON
+            headers=headers,  # Заголовки запроса
+            proxies=proxies,  # Прокси-сервер (если указан)
+            impersonate="chrome124",  # Имитация браузера Chrome версии 124
+        )
+        # Передача кода ответа ограничителю (403/429 снижают лимит)
+        slot.record(response.status_code)
     
     # Преобразование ответа в формат JSON
     data = response.json()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Пакет не устанавливается, поэтому добавляем src в путь импорта
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
@@ -0,0 +1,265 @@
+import threading
+import time
+
+import pytest
+
+from pyzill import details, search
+from pyzill import limiter as limiter_module
+from pyzill.limiter import AdaptiveLimiter, configure_limiter, get_limiter, limiter_stats
+
+
+def run(limiter, status_code=None):
+    """
+    Выполняет один запрос через ограничитель с заданным кодом ответа
+    """
+    with limiter.request() as slot:
+        if status_code is not None:
+            slot.record(status_code)
+
+
+def reasons(limiter):
+    """
+    Возвращает причины изменений лимита из истории
+    """
+    return [entry["reason"] for entry in limiter.history]
+
+
+@pytest.fixture(autouse=True)
+def clean_registry(monkeypatch):
+    # Каждый тест работает с пустым реестром ограничителей
+    monkeypatch.setattr(limiter_module, "_limiters", {})
+
+
+def test_additive_growth_stops_at_max_limit():
+    limiter = AdaptiveLimiter("test", initial_limit=2, max_limit=5)
+    for _ in range(100):
+        run(limiter, 200)
+    assert limiter.limit == 5
+    assert [entry["limit"] for entry in limiter.history] == [2, 3, 4, 5]
+
+
+def test_burst_of_throttled_responses_cuts_once_per_generation():
+    limiter = AdaptiveLimiter("test", initial_limit=8, max_limit=8)
+    entered = threading.Barrier(9)
+    release = threading.Event()
+
+    def worker():
+        with limiter.request() as slot:
+            entered.wait()
+            release.wait()
+            slot.record(429)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    # Все 8 запросов начались до первого ответа 429
+    entered.wait()
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert limiter.limit == 4
+    assert reasons(limiter) == ["init", "throttled"]
+
+
+def test_successes_after_single_error_do_not_cut_limit():
+    limiter = AdaptiveLimiter("test", initial_limit=32, max_limit=32)
+    run(limiter, 429)
+    for _ in range(200):
+        run(limiter, 200)
+    assert reasons(limiter).count("throttled") == 1
+    assert "errors" not in reasons(limiter)
+
+    limiter = AdaptiveLimiter("test", initial_limit=32, max_limit=32)
+    with pytest.raises(OSError):
+        with limiter.request():
+            raise OSError
+    for _ in range(200):
+        run(limiter, 200)
+    assert limiter.limit == 32
+    assert reasons(limiter) == ["init"]
+
+
+def test_limit_does_not_drop_below_min_limit():
+    limiter = AdaptiveLimiter("test", initial_limit=16, min_limit=3)
+    for _ in range(10):
+        with limiter.request() as slot:
+            # Следующий запрос должен начаться строго после предыдущего снижения
+            time.sleep(0.001)
+            slot.record(429)
+    assert limiter.limit == 3
+    assert [entry["limit"] for entry in limiter.history] == [16, 8, 4, 3]
+
+
+def test_slot_is_failed_when_block_raises():
+    limiter = AdaptiveLimiter("test")
+    with pytest.raises(ValueError):
+        with limiter.request():
+            raise ValueError("parse error")
+    assert limiter.in_flight == 0
+    assert limiter.snapshot()["error_rate"] == pytest.approx(limiter.smoothing)
+
+
+def test_other_client_errors_do_not_grow_limit():
+    limiter = AdaptiveLimiter("test", initial_limit=2)
+    for _ in range(50):
+        run(limiter, 404)
+    assert limiter.limit == 2
+    assert limiter.snapshot()["error_rate"] == 0.0
+
+
+def test_high_latency_stops_growth():
+    limiter = AdaptiveLimiter("test", initial_limit=2, latency_target=0.01)
+    for _ in range(10):
+        with limiter.request() as slot:
+            # Задержка заметно больше допустимой даже при грубом таймере
+            time.sleep(0.05)
+            slot.record(200)
+    assert limiter.limit == 2
+    assert reasons(limiter) == ["init"]
+
+
+def test_consecutive_server_errors_cut_limit():
+    limiter = AdaptiveLimiter("test", initial_limit=8)
+    run(limiter, 503)
+    # Одна ошибка (доля 0.1) не превышает порог по умолчанию
+    assert limiter.limit == 8
+    run(limiter, 502)
+    assert limiter.limit == 4
+    assert reasons(limiter) == ["init", "errors"]
+
+
+def test_request_blocks_until_slot_is_released():
+    limiter = AdaptiveLimiter("test", initial_limit=2, max_limit=2)
+    release = threading.Event()
+    third_entered = threading.Event()
+
+    def holder():
+        with limiter.request() as slot:
+            release.wait()
+            slot.record(200)
+
+    def waiter():
+        with limiter.request() as slot:
+            third_entered.set()
+            slot.record(200)
+
+    holders = [threading.Thread(target=holder) for _ in range(2)]
+    for thread in holders:
+        thread.start()
+    while limiter.in_flight < 2:
+        time.sleep(0.001)
+    third = threading.Thread(target=waiter)
+    third.start()
+    assert not third_entered.wait(0.1)
+    assert limiter.in_flight == 2
+
+    release.set()
+    assert third_entered.wait(1)
+    for thread in [*holders, third]:
+        thread.join()
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"initial_limit": 0},
+        {"min_limit": 5, "initial_limit": 4},
+        {"backoff_factor": 1.0},
+        {"error_threshold": 1.0},
+        {"error_threshold": -0.1},
+        {"smoothing": 0.0},
+        {"smoothing": 1.5},
+        {"additive_increase": 0},
+        {"additive_increase": -2},
+        {"latency_target": -1.0},
+        {"history_size": 0},
+    ],
+)
+def test_invalid_options_are_rejected(options):
+    with pytest.raises(ValueError):
+        AdaptiveLimiter("test", **options)
+
+
+def test_failed_configure_leaves_limiter_unchanged():
+    limiter = AdaptiveLimiter("test", initial_limit=4, max_limit=16)
+    with pytest.raises(ValueError):
+        limiter.configure(max_limit=8, history_size=-1)
+    with pytest.raises(ValueError):
+        limiter.configure(max_limit=8, additive_increase=-2)
+    assert limiter.max_limit == 16
+    assert limiter.additive_increase == 1.0
+    assert reasons(limiter) == ["init"]
+
+
+def test_limit_never_drops_below_min_limit_on_growth():
+    limiter = AdaptiveLimiter("test", initial_limit=1)
+    # Обходим проверку параметров, чтобы проверить защиту в самом _increase
+    limiter.additive_increase = -2
+    run(limiter, 200)
+    assert limiter.limit == 1
+
+
+class FakeResponse:
+    """
+    Ответ-заглушка с заданным HTTP-кодом
+    """
+
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.content = b""
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return {}
+
+
+def test_requests_report_status_to_endpoint_limiters(monkeypatch):
+    monkeypatch.setattr(details.requests, "get", lambda **kwargs: FakeResponse(429))
+    monkeypatch.setattr(search.requests, "put", lambda **kwargs: FakeResponse(429))
+    homedetails = configure_limiter("homedetails", initial_limit=8)
+    search_limiter = configure_limiter("search", initial_limit=8)
+
+    with pytest.raises(RuntimeError):
+        details.get_from_home_url("https://www.zillow.com/homedetails/any-title/1_zpid/")
+    search.search(1, "", None, None, None, None, None, None, 1.0, 1.0, 0.0, 0.0, 10, {})
+
+    assert homedetails.limit == 4
+    assert search_limiter.limit == 4
+    assert reasons(homedetails) == ["init", "throttled"]
+    assert reasons(search_limiter) == ["init", "throttled"]
+
+
+def test_registry_keeps_one_limiter_per_endpoint():
+    search = get_limiter("search", initial_limit=3)
+    assert get_limiter("search", initial_limit=10) is search
+    assert search.limit == 3
+    assert get_limiter("homedetails") is not search
+
+    stats = limiter_stats()
+    assert set(stats) == {"search", "homedetails"}
+    assert stats["search"]["limit"] == 3
+    assert stats["search"]["history"][0]["reason"] == "init"
+
+
+def test_configure_limiter_updates_existing_instance():
+    limiter = get_limiter("search", initial_limit=8)
+    with limiter.request():
+        assert configure_limiter("search", max_limit=4) is limiter
+        assert limiter.limit == 4
+        assert limiter.in_flight == 1
+    assert reasons(limiter) == ["init", "configure"]
+
+    configure_limiter("search", initial_limit=2)
+    assert limiter.limit == 2
+    assert limiter.max_limit == 4
+
+    created = configure_limiter("new", initial_limit=5)
+    assert get_limiter("new") is created
+    assert created.limit == 5
+
+    with pytest.raises(TypeError):
+        configure_limiter("search", unknown=1)